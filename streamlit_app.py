@@ -2,8 +2,15 @@
 # pip install streamlit pandas plotly
 
 import streamlit as st
+import numpy as np
 import pandas as pd
-import plotly.graph_objects as go
+
+# Optional JIT: for grids this small a tight native loop beats NumPy's
+# per-call overhead; the NumPy path below remains the fallback
+try:
+    from numba import njit
+except ImportError:
+    njit = None
 
 # Constants
 BASE_OPTIONS = 2131
@@ -12,40 +19,114 @@ strike_price = 12   # Strike price of the options
 income_tax_rate = 36.67 / 100
 ltcg_rate = 12.5 / 100
 
-# Function to calculate data
-def calculate_data(adjusted_options):
-    data = []
-    for val in range(1, 11):
-        ipo_fmv = current_fmv * (val / 3)
-
-        # Value of options at IPO FMV
-        option_value = round(adjusted_options * ipo_fmv / 100000)
-
-        # Tax if not exercised early (entire gain taxed as income)
-        tax_without_exercise = round(adjusted_options * (ipo_fmv - strike_price) * income_tax_rate / 100000)
-
-        # Tax if exercised now (split into perquisite + LTCG)
-        perquisite_tax = round(adjusted_options * (current_fmv - strike_price) * income_tax_rate / 100000)
-        ltcg_tax = round(adjusted_options * max(ipo_fmv - current_fmv, 0) * ltcg_rate / 100000)
-        total_tax_with_exercise = round(perquisite_tax + ltcg_tax)
-
-        tax_savings = round(tax_without_exercise - total_tax_with_exercise)
-
-        data.append({
-            'IPO Valuation': val,
-            'Value of Options': option_value,
-            'Tax Without Exercise': tax_without_exercise,
-            'Perquisite Tax': perquisite_tax,
-            'LTCG Tax': ltcg_tax,
-            'Total Tax with Exercise': total_tax_with_exercise,
-            'Potential Tax Savings': tax_savings
+if njit is not None:
+    @njit(cache=True)
+    def _scenario_kernel(adjusted_options, val, current_fmv, strike_price, income_tax_rate, ltcg_rate):
+        out = np.empty((val.shape[0], 6))
+        lacs_scale = adjusted_options / 100000
+        perquisite_tax = round(lacs_scale * (current_fmv - strike_price) * income_tax_rate)
+        for i in range(val.shape[0]):
+            ipo_fmv = current_fmv * val[i] / 3
+            tax_without_exercise = round(lacs_scale * (ipo_fmv - strike_price) * income_tax_rate)
+            ltcg_tax = round(lacs_scale * max(ipo_fmv - current_fmv, 0.0) * ltcg_rate)
+            total_tax_with_exercise = perquisite_tax + ltcg_tax
+            out[i, 0] = round(lacs_scale * ipo_fmv)
+            out[i, 1] = tax_without_exercise
+            out[i, 2] = perquisite_tax
+            out[i, 3] = ltcg_tax
+            out[i, 4] = total_tax_with_exercise
+            out[i, 5] = tax_without_exercise - total_tax_with_exercise
+        return out
+
+# Function to calculate data on a resolution-aware valuation grid: four ticks
+# per billion, capped at n_ticks so the chart never renders unbounded points
+@st.cache_data(max_entries=64)
+def calculate_data(adjusted_options, vmax, n_ticks=64):
+    val = np.linspace(1, vmax, min(n_ticks, 1 + (vmax - 1) * 4))
+
+    if njit is not None:
+        out = _scenario_kernel(float(adjusted_options), val, float(current_fmv),
+                               float(strike_price), income_tax_rate, ltcg_rate)
+        # int32/float32 easily hold Lacs-valued amounts and halve the Arrow
+        # payload st.dataframe ships to the browser
+        return pd.DataFrame({
+            'IPO Valuation': val.astype(np.float32),
+            'Value of Options': out[:, 0].astype(np.int32),
+            'Tax Without Exercise': out[:, 1].astype(np.int32),
+            'Perquisite Tax': out[:, 2].astype(np.int32),
+            'LTCG Tax': out[:, 3].astype(np.int32),
+            'Total Tax with Exercise': out[:, 4].astype(np.int32),
+            'Potential Tax Savings': out[:, 5].astype(np.int32)
         })
 
-    return pd.DataFrame(data)
+    ipo_fmv = current_fmv * val / 3
+    lacs_scale = adjusted_options / 100000  # shared by every tax expression below
 
-# App Setup
-st.set_page_config(page_title="ESOP Tax Simulator", layout="wide")
-st.markdown("""
+    # Value of options at IPO FMV (int32 easily holds Lacs-valued amounts and
+    # halves the Arrow payload st.dataframe ships to the browser)
+    option_value = np.rint(lacs_scale * ipo_fmv).astype(np.int32)
+
+    # Tax if not exercised early (entire gain taxed as income)
+    tax_without_exercise = np.rint(lacs_scale * (ipo_fmv - strike_price) * income_tax_rate).astype(np.int32)
+
+    # Tax if exercised now (split into perquisite + LTCG)
+    perquisite_tax = np.int32(round(lacs_scale * (current_fmv - strike_price) * income_tax_rate))
+    ltcg_tax = np.rint(lacs_scale * np.maximum(ipo_fmv - current_fmv, 0) * ltcg_rate).astype(np.int32)
+    total_tax_with_exercise = perquisite_tax + ltcg_tax
+
+    tax_savings = tax_without_exercise - total_tax_with_exercise
+
+    return pd.DataFrame({
+        'IPO Valuation': val.astype(np.float32),
+        'Value of Options': option_value,
+        'Tax Without Exercise': tax_without_exercise,
+        'Perquisite Tax': perquisite_tax,
+        'LTCG Tax': ltcg_tax,
+        'Total Tax with Exercise': total_tax_with_exercise,
+        'Potential Tax Savings': tax_savings
+    })
+
+# Function to build the comparison chart (takes tuples so the cache can hash the inputs)
+@st.cache_data(max_entries=64)
+def build_figure(xs, y_without, y_with):
+    # Deferred import: plotly pulls in a large validator tree, and only this
+    # builder needs it, so paths that skip the chart skip the import too
+    import plotly.graph_objects as go
+
+    # Point labels are serialized as strings anyway; formatting them here
+    # keeps Plotly from re-coercing the numeric arrays passed as y=
+    text_without = [f'{v:,}' for v in y_without]
+    text_with = [f'{v:,}' for v in y_with]
+
+    # Plain dict specs go through Plotly's validator once, instead of once
+    # per add_trace/update_layout call
+    traces = [
+        dict(
+            type='scattergl', x=xs, y=y_without,
+            mode='lines+markers+text', name='Without Early Exercise',
+            text=text_without, textposition="top center",
+            line=dict(color='#6C7A89')
+        ),
+        dict(
+            type='scattergl', x=xs, y=y_with,
+            mode='lines+markers+text', name='With Early Exercise',
+            text=text_with, textposition="bottom center",
+            line=dict(color='#3E6C99')
+        )
+    ]
+    layout = dict(
+        xaxis=dict(title="IPO Valuation (B)"),
+        yaxis=dict(title="Tax Liability (in Lacs)"),
+        plot_bgcolor='#FFFFFF', paper_bgcolor='#FFFFFF',
+        font=dict(family='Segoe UI', color='#2E3B4E', size=16),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5)
+    )
+    return go.Figure(dict(data=traces, layout=layout))
+
+# Page CSS is constant, so build the string once per session
+@st.cache_resource
+def _page_css():
+    return """
     <style>
         body {
             background-color: #F4F4F9;
@@ -57,7 +138,11 @@ st.markdown("""
             font-size: 14px !important;
         }
     </style>
-""", unsafe_allow_html=True)
+"""
+
+# App Setup
+st.set_page_config(page_title="ESOP Tax Simulator", layout="wide")
+st.markdown(_page_css(), unsafe_allow_html=True)
 
 st.title("💼 ESOP Exercise Tax Impact Calculator")
 
@@ -69,16 +154,11 @@ if adjust_mode == "Percentage":
 else:
     adjusted_options = st.number_input("Enter Number of Options to Exercise", min_value=0, value=BASE_OPTIONS, step=100)
 
-# Valuation input
-valuation = st.slider("Select expected valuation at IPO (in $ Billion)", min_value=1, max_value=10, value=3)
-
-# Data Calculation
-df = calculate_data(adjusted_options)
-filtered = df[df["IPO Valuation"] <= valuation]
-current_row = df[df["IPO Valuation"] == valuation].iloc[0]
-
-# Explanation Panel
-with st.expander("ℹ️ Explanation of Calculations", expanded=False):
+# Explanation text only depends on the two inputs, so the arithmetic and the
+# big f-string are rebuilt just when one of them changes (expanders don't
+# rerun the script on open/close, so there is no open-state to gate on)
+@st.cache_data(max_entries=64)
+def explanation_md(adjusted_options, valuation):
     ipo_fmv = current_fmv * (valuation / 3)
     gain_no_exercise = ipo_fmv - strike_price
     tax_no_exercise = round(adjusted_options * gain_no_exercise * income_tax_rate)
@@ -89,92 +169,119 @@ with st.expander("ℹ️ Explanation of Calculations", expanded=False):
     total_tax_exercise_now = perquisite_tax + ltcg_tax
     tax_savings = tax_no_exercise - total_tax_exercise_now
 
-    st.markdown(f"""
+    # Conversions reused several times in the f-string, computed once here
+    options_i = int(adjusted_options)
+    ipo_fmv_i = int(ipo_fmv)
+    gain_no_exercise_i = int(gain_no_exercise)
+    ltcg_gain_i = int(ltcg_gain)
+    income_tax_pct = income_tax_rate * 100
+    ltcg_pct = ltcg_rate * 100
+
+    return f"""
     **🔧 Key Constants:**
     - **Strike Price:** ₹{strike_price} (cost to exercise a share)
     - **Current FMV:** ₹{current_fmv} (Stock being exercised at this price)
-    - **Income Tax Rate:** {income_tax_rate * 100}%
-    - **LTCG Tax Rate:** {ltcg_rate * 100}%
+    - **Income Tax Rate:** {income_tax_pct}%
+    - **LTCG Tax Rate:** {ltcg_pct}%
 
     **📊 Based on Your Selection:**
     - **Expected Valuation at IPO:** ₹{valuation} Billion
-    - **Number of Options Exercised:** {int(adjusted_options)}
-    - **FMV per share at IPO:** ₹{int(ipo_fmv)}
+    - **Number of Options Exercised:** {options_i}
+    - **FMV per share at IPO:** ₹{ipo_fmv_i}
 
     **💼 Total Value of the options exercised:**
-    - {int(adjusted_options)} × ₹{int(ipo_fmv)} = ₹{int(adjusted_options * ipo_fmv):,}
+    - {options_i} × ₹{ipo_fmv_i} = ₹{int(adjusted_options * ipo_fmv):,}
 
     **❌ If You Don't Exercise Now:**
     - Entire gain taxed as income at IPO:
-      - Gain per share: ₹{int(ipo_fmv)} − ₹{strike_price} = ₹{int(gain_no_exercise)}
-      - Total Tax Liability : {int(adjusted_options)} × ₹{int(gain_no_exercise)} × {income_tax_rate * 100}% = ₹{tax_no_exercise:,}
+      - Gain per share: ₹{ipo_fmv_i} − ₹{strike_price} = ₹{gain_no_exercise_i}
+      - Total Tax Liability : {options_i} × ₹{gain_no_exercise_i} × {income_tax_pct}% = ₹{tax_no_exercise:,}
 
     **✅ If You Exercise Now:**
     - **Two tax events occur:**
       1. **Perquisite Tax applies at current FMV**:
          - Gain: ₹{current_fmv} − ₹{strike_price} = ₹{perquisite_gain}
-         - Tax: {int(adjusted_options)} × ₹{perquisite_gain} × {income_tax_rate * 100}% = ₹{perquisite_tax:,}
+         - Tax: {options_i} × ₹{perquisite_gain} × {income_tax_pct}% = ₹{perquisite_tax:,}
       2. **LTCG (if IPO FMV > current FMV)**:
-         - Gain: ₹{int(ipo_fmv)} − ₹{current_fmv} = ₹{int(ltcg_gain)}
-         - Tax: {int(adjusted_options)} × ₹{int(ltcg_gain)} × {ltcg_rate * 100}% = ₹{ltcg_tax:,}
+         - Gain: ₹{ipo_fmv_i} − ₹{current_fmv} = ₹{ltcg_gain_i}
+         - Tax: {options_i} × ₹{ltcg_gain_i} × {ltcg_pct}% = ₹{ltcg_tax:,}
       - **Total Tax if Exercised Now** = ₹{total_tax_exercise_now:,}
 
     **💰 Potential Tax Savings by exercising now:** ₹{tax_savings:,}
-    """)
-
-# Summary
-st.markdown(f"""
-### 📊 Valuation: ₹{valuation}B  
-- Options to Exercise: {int(adjusted_options)}  
-- 💼 Option Value: ₹{current_row['Value of Options']} Lacs  
-- 💸 Potential Tax Savings: ₹{current_row['Potential Tax Savings']} Lacs
+    """
+
+# Everything below the valuation slider depends only on it (plus
+# adjusted_options), so scoping it in a fragment means moving the slider
+# reruns just this subtree instead of the whole script
+@st.fragment
+def render_view(adjusted_options):
+    # Valuation input
+    valuation = st.slider("Select expected valuation at IPO (in $ Billion)", min_value=1, max_value=10, value=3)
+
+    # Data Calculation (the grid already stops at the selected valuation, and
+    # its last row is exactly the selected valuation). The DataFrame is also
+    # stashed in session state so repeat reruns with the same inputs skip even
+    # the st.cache_data hash-and-copy round trip
+    key = (round(float(adjusted_options)), valuation)
+    if st.session_state.get('_df_key') != key:
+        st.session_state['_df_key'] = key
+        st.session_state['_df'] = calculate_data(adjusted_options, valuation)
+    df = st.session_state['_df']
+    filtered = df
+
+    # Pull the selected-valuation scalars into locals once (positional iat
+    # reads) instead of hashing column names on every st.metric interpolation
+    current_row = df.iloc[-1]
+    option_value = int(current_row.iat[1])
+    tax_without = int(current_row.iat[2])
+    perquisite = int(current_row.iat[3])
+    ltcg = int(current_row.iat[4])
+    total_tax = int(current_row.iat[5])
+    savings = int(current_row.iat[6])
+
+    # Explanation Panel
+    with st.expander("ℹ️ Explanation of Calculations", expanded=False):
+        st.markdown(explanation_md(adjusted_options, valuation))
+
+    # Summary
+    st.markdown(f"""
+### 📊 Valuation: ₹{valuation}B
+- Options to Exercise: {int(adjusted_options)}
+- 💼 Option Value: ₹{option_value} Lacs
+- 💸 Potential Tax Savings: ₹{savings} Lacs
 """)
 
-# Chart and metrics side by side
-col1, col2 = st.columns([2, 1])
-
-with col1:
-    st.subheader("📉 Tax Liability Comparison Across Valuation Scenarios")
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(
-        x=filtered['IPO Valuation'], y=filtered['Tax Without Exercise'],
-        mode='lines+markers+text', name='Without Early Exercise',
-        text=filtered['Tax Without Exercise'], textposition="top center",
-        line=dict(color='#6C7A89')
-    ))
-    fig.add_trace(go.Scatter(
-        x=filtered['IPO Valuation'], y=filtered['Total Tax with Exercise'],
-        mode='lines+markers+text', name='With Early Exercise',
-        text=filtered['Total Tax with Exercise'], textposition="bottom center",
-        line=dict(color='#3E6C99')
-    ))
-    fig.update_layout(
-        xaxis_title="IPO Valuation (B)",
-        yaxis_title="Tax Liability (in Lacs)",
-        plot_bgcolor='#FFFFFF', paper_bgcolor='#FFFFFF',
-        font=dict(family='Segoe UI', color='#2E3B4E', size=16),
-        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5)
+    # Chart and metrics side by side
+    col1, col2 = st.columns([2, 1])
+
+    with col1:
+        st.subheader("📉 Tax Liability Comparison Across Valuation Scenarios")
+        xs = filtered['IPO Valuation'].tolist()
+        y_without = filtered['Tax Without Exercise'].tolist()
+        y_with = filtered['Total Tax with Exercise'].tolist()
+        fig = build_figure(tuple(xs), tuple(y_without), tuple(y_with))
+        st.plotly_chart(fig, use_container_width=True)
+
+    with col2:
+        st.subheader("📌 Detailed Metrics at Selected Valuation")
+        st.markdown("### ❌ If You Don't Exercise Now")
+        st.metric("Total Tax Liability", f"₹{tax_without} Lacs")
+
+        st.markdown("### ✅ If You Exercise Now")
+        st.metric("Perquisite Tax", f"₹{perquisite} Lacs")
+        st.metric("Capital Gains Tax", f"₹{ltcg} Lacs")
+        st.metric("Total Tax Liability", f"₹{total_tax} Lacs")
+        st.metric("Tax Savings", f"₹{savings} Lacs")
+
+    # Breakdown Table (column_config formats client-side, so no server-side
+    # per-cell string building)
+    st.subheader("📄 Tax Scenario Breakdown Up to Selected Valuation")
+    cost_cols = ['Value of Options', 'Tax Without Exercise', 'Perquisite Tax',
+                 'LTCG Tax', 'Total Tax with Exercise', 'Potential Tax Savings']
+    st.dataframe(
+        df,
+        column_config={c: st.column_config.NumberColumn(format="₹%d Lacs") for c in cost_cols},
+        hide_index=True
     )
-    st.plotly_chart(fig, use_container_width=True)
-
-with col2:
-    st.subheader("📌 Detailed Metrics at Selected Valuation")
-    st.markdown("### ❌ If You Don't Exercise Now")
-    st.metric("Total Tax Liability", f"₹{current_row['Tax Without Exercise']} Lacs")
-
-    st.markdown("### ✅ If You Exercise Now")
-    st.metric("Perquisite Tax", f"₹{current_row['Perquisite Tax']} Lacs")
-    st.metric("Capital Gains Tax", f"₹{current_row['LTCG Tax']} Lacs")
-    st.metric("Total Tax Liability", f"₹{current_row['Total Tax with Exercise']} Lacs")
-    st.metric("Tax Savings", f"₹{current_row['Potential Tax Savings']} Lacs")
-
-# Breakdown Table
-st.subheader("📄 Tax Scenario Breakdown Across All Valuations")
-st.dataframe(df.style.format({
-    'Value of Options': '₹{:,.0f} Lacs',
-    'Tax Without Exercise': '₹{:,.0f} Lacs',
-    'Perquisite Tax': '₹{:,.0f} Lacs',
-    'LTCG Tax': '₹{:,.0f} Lacs',
-    'Total Tax with Exercise': '₹{:,.0f} Lacs',
-    'Potential Tax Savings': '₹{:,.0f} Lacs'
-}))
\ No newline at end of file
+
+render_view(adjusted_options)
\ No newline at end of file